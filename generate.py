@@ -5,14 +5,20 @@ Resume Generator - Async bulk PDF resume generation with cost tracking.
 
 import argparse
 import asyncio
-import json
+import atexit
+import concurrent.futures
 import os
 import random
 import sys
 import time
-from dataclasses import dataclass, field
+from collections import deque
+from dataclasses import dataclass
+from itertools import islice
 from pathlib import Path
 
+import aiofiles
+import httpx
+import orjson
 from faker import Faker
 from jinja2 import Environment, FileSystemLoader
 from openai import AsyncOpenAI
@@ -31,81 +37,214 @@ from rich.progress import (
 )
 from rich.table import Table
 from weasyprint import HTML
+from weasyprint.text.fonts import FontConfiguration
 
-from models.prompts import build_prompt
+try:
+    import uvloop
+except ImportError:  # uvloop is Unix-only; fall back to the stdlib loop
+    uvloop = None
+
+try:
+    # Chromium renders HTML to PDF several times faster than WeasyPrint;
+    # optional dependency, activated explicitly via --renderer chromium
+    from playwright.sync_api import sync_playwright
+except ImportError:
+    sync_playwright = None
+
+from models.prompts import build_batch_prompt
 
 # Initialize
 console = Console()
-fake = Faker()
+fake: Faker  # created per render worker by _init_render_worker
 
 # Configuration
 MODEL = "gpt-5-nano"
 TEMPLATES = ["minimal.html", "modern.html", "classic.html", "corporate.html"]
 OUTPUT_DIR = Path("output")
 MAX_CONCURRENT = 15  # Concurrent API requests
+BATCH_SIZE = 4  # Resumes per API request
+
+# Per-minute API budgets (gpt-5-nano tier-1 defaults, tunable via CLI)
+REQUESTS_PER_MINUTE = 500
+TOKENS_PER_MINUTE = 200_000
+
+# Rough completion-size estimate used to reserve token budget up front;
+# trued up with actual usage once the response arrives
+EST_COMPLETION_TOKENS_PER_RESUME = 700
 
 # Pricing per 1M tokens for gpt-5-nano
 PRICE_INPUT_PER_1M = 0.05   # $0.05 per 1M input tokens
+PRICE_CACHED_INPUT_PER_1M = 0.005  # $0.005 per 1M cached input tokens (10% of input)
 PRICE_OUTPUT_PER_1M = 0.40  # $0.40 per 1M output tokens
 
 # Load role mapping
-with open("data/role_mapping.json") as f:
-    ROLE_MAPPING = json.load(f)
+with open("data/role_mapping.json", "rb") as f:
+    ROLE_MAPPING = orjson.loads(f.read())
 
 INDUSTRIES = list(ROLE_MAPPING.keys())
 
 
+def _build_flat_roles() -> tuple[list[tuple[str, str]], list[float]]:
+    """Flatten the industry->role mapping into one weighted table.
+
+    Each (industry, role) pair carries its joint probability (uniform
+    industry draw x normalized primary/secondary weight x uniform role
+    within the pool), so a whole run's assignments come from a single
+    random.choices call instead of a two-step draw per resume.
+    """
+    pairs = []
+    cum_weights = []
+    running = 0.0
+    for industry, mapping in ROLE_MAPPING.items():
+        weight_total = sum(mapping["weights"])
+        for pool_name, weight in zip(("primary", "secondary"), mapping["weights"]):
+            roles = mapping[pool_name]
+            p_role = (weight / weight_total) / (len(ROLE_MAPPING) * len(roles))
+            for role in roles:
+                pairs.append((industry, role))
+                running += p_role
+                cum_weights.append(running)
+    return pairs, cum_weights
+
+
+_FLAT_ROLES, _FLAT_CUM = _build_flat_roles()
+
+
+def draw_assignments(n: int) -> list[tuple[str, str]]:
+    """Pre-draw n weighted (industry, role) assignments in one pass."""
+    return random.choices(_FLAT_ROLES, cum_weights=_FLAT_CUM, k=n)
+
+
 @dataclass
 class CostTracker:
-    """Track token usage and costs."""
+    """Track token usage and costs, including prompt-cache discounts.
+
+    Only running totals are kept - per-request detail is streamed to the
+    JSONL cost log rather than accumulated in memory.
+    """
     total_input_tokens: int = 0
+    total_cached_tokens: int = 0
     total_output_tokens: int = 0
-    resume_costs: list = field(default_factory=list)
+    total_cost: float = 0.0
+    request_count: int = 0
 
-    def add_usage(self, input_tokens: int, output_tokens: int) -> float:
-        """Add token usage and return cost for this request."""
-        self.total_input_tokens += input_tokens
-        self.total_output_tokens += output_tokens
+    def add_usage(self, usage) -> float:
+        """Add usage from an API response and return cost for this request.
+
+        Cached prompt tokens (reported in ``usage.prompt_tokens_details``)
+        are billed at the discounted cached-input rate.
+        """
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached_tokens = getattr(details, "cached_tokens", 0) or 0
+        uncached_tokens = usage.prompt_tokens - cached_tokens
+
+        self.total_input_tokens += usage.prompt_tokens
+        self.total_cached_tokens += cached_tokens
+        self.total_output_tokens += usage.completion_tokens
 
         cost = (
-            (input_tokens / 1_000_000) * PRICE_INPUT_PER_1M +
-            (output_tokens / 1_000_000) * PRICE_OUTPUT_PER_1M
+            (uncached_tokens / 1_000_000) * PRICE_INPUT_PER_1M +
+            (cached_tokens / 1_000_000) * PRICE_CACHED_INPUT_PER_1M +
+            (usage.completion_tokens / 1_000_000) * PRICE_OUTPUT_PER_1M
         )
-        self.resume_costs.append(cost)
+        self.total_cost += cost
+        self.request_count += 1
         return cost
 
     @property
-    def total_cost(self) -> float:
-        return sum(self.resume_costs)
-
-    @property
-    def avg_cost(self) -> float:
-        return self.total_cost / len(self.resume_costs) if self.resume_costs else 0
-
+    def cache_hit_rate(self) -> float:
+        if not self.total_input_tokens:
+            return 0
+        return self.total_cached_tokens / self.total_input_tokens
 
-def select_role(industry: str) -> str:
-    """Select a role based on industry with weighted probabilities."""
-    mapping = ROLE_MAPPING[industry]
-    weights = mapping["weights"]
 
-    # Choose between primary (index 0) and secondary (index 1) based on weights
-    tier_index = random.choices(range(len(weights)), weights=weights)[0]
-
-    if tier_index == 0:
-        return random.choice(mapping["primary"])
-    else:
-        return random.choice(mapping["secondary"])
+@dataclass
+class ProgressCounter:
+    """Plain completion counter flushed to Rich on a timer.
+
+    On big runs every per-task progress.advance acquires Rich's render
+    lock, which becomes a serialization point at high concurrency;
+    workers bump this counter instead and a background task pushes it to
+    the progress bar every 100 ms.
+    """
+    completed: int = 0
+
+
+class RateLimiter:
+    """Keep request and token spend inside per-minute API budgets.
+
+    A small credit semaphore: each acquire reserves one request plus an
+    estimated token count against rolling 60-second windows, and the
+    reservation is trued up with actual usage when the response arrives.
+    Acquirers sleep until enough budget has aged out of the window, so
+    high --concurrency settings throttle smoothly at the account ceiling
+    instead of oscillating between 429 backoffs and idle periods.
+    """
+
+    def __init__(self, rpm: int, tpm: int):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._events: deque[list] = deque()  # [timestamp, tokens, active]
+        self._tokens_in_window = 0
+        self._lock = asyncio.Lock()
+
+    def _expire(self, now: float) -> None:
+        while self._events and now - self._events[0][0] > 60:
+            reservation = self._events.popleft()
+            self._tokens_in_window -= reservation[1]
+            reservation[2] = False
+
+    async def acquire(self, estimated_tokens: int) -> list:
+        """Reserve budget for one request; returns the reservation."""
+        while True:
+            async with self._lock:
+                now = time.monotonic()
+                self._expire(now)
+                if (len(self._events) < self.rpm
+                        and self._tokens_in_window + estimated_tokens <= self.tpm):
+                    reservation = [now, estimated_tokens, True]
+                    self._events.append(reservation)
+                    self._tokens_in_window += estimated_tokens
+                    return reservation
+                # Sleep until the oldest reservation ages out
+                wait = 60 - (now - self._events[0][0]) if self._events else 0.1
+            await asyncio.sleep(max(wait, 0.1))
+
+    async def commit(self, reservation: list, actual_tokens: int) -> None:
+        """Replace a reservation's estimate with actual token usage.
+
+        A no-op when the reservation has already aged out of the window
+        (slow responses can outlive the 60-second window); adjusting it
+        then would leave phantom tokens that never expire.
+        """
+        async with self._lock:
+            if not reservation[2]:
+                return
+            self._tokens_in_window += actual_tokens - reservation[1]
+            reservation[1] = actual_tokens
 
 
 async def generate_resume_data(
     client: AsyncOpenAI,
-    industry: str,
-    role: str,
-    seniority: int,
-    cost_tracker: CostTracker
-) -> tuple[dict, float]:
-    """Generate structured resume data from LLM."""
-    system_prompt, user_prompt = build_prompt(industry, role, seniority)
+    specs: list[tuple[str, str, int]],
+    cost_tracker: CostTracker,
+    limiter: RateLimiter
+) -> tuple[list[dict], float, object]:
+    """Generate structured resume data for a batch of specs in one LLM call.
+
+    One request for K resumes amortizes the HTTP round-trip and
+    per-request overhead across the batch; the shared prompt prefix
+    stays cacheable because only the parameter lines vary.
+    """
+    system_prompt, user_prompt = build_batch_prompt(specs)
+
+    # Reserve budget before sending: prompt estimated at ~4 chars/token
+    # plus the expected completion size for the batch
+    estimated_tokens = (
+        (len(system_prompt) + len(user_prompt)) // 4
+        + len(specs) * EST_COMPLETION_TOKENS_PER_RESUME
+    )
+    reservation = await limiter.acquire(estimated_tokens)
 
     response = await client.chat.completions.create(
         model=MODEL,
@@ -116,73 +255,205 @@ async def generate_resume_data(
         response_format={"type": "json_object"}
     )
 
-    # Track tokens and cost
-    usage = response.usage
-    cost = cost_tracker.add_usage(usage.prompt_tokens, usage.completion_tokens)
+    # Track tokens and cost; true up the budget reservation
+    await limiter.commit(reservation, response.usage.total_tokens)
+    cost = cost_tracker.add_usage(response.usage)
+
+    # The response must carry exactly one resume per spec - anything
+    # else would silently drop indices downstream, so fail loudly
+    resumes = orjson.loads(response.choices[0].message.content)["resumes"]
+    if len(resumes) != len(specs):
+        raise ValueError(
+            f"Batch response returned {len(resumes)} resumes "
+            f"for {len(specs)} requested specs"
+        )
+    return resumes, cost, response.usage
+
+
+# Contact generation - Faker is kept only for names and emails/cities,
+# which are pre-drawn in batches; phone numbers and state abbreviations
+# are formatted inline, which is far cheaper than Faker's providers
+_STATE_ABBRS = (
+    "AL", "AK", "AZ", "AR", "CA", "CO", "CT", "DE", "FL", "GA",
+    "HI", "ID", "IL", "IN", "IA", "KS", "KY", "LA", "ME", "MD",
+    "MA", "MI", "MN", "MS", "MO", "MT", "NE", "NV", "NH", "NJ",
+    "NM", "NY", "NC", "ND", "OH", "OK", "OR", "PA", "RI", "SC",
+    "SD", "TN", "TX", "UT", "VT", "VA", "WA", "WV", "WI", "WY",
+)
+_CONTACT_BATCH = 256
+_contacts: deque = deque()
 
-    return json.loads(response.choices[0].message.content), cost
+# PDF metadata dict reused across renders within a worker process
+_metadata: dict = {}
+
+# Persistent Chromium page, set per worker by _init_render_worker
+_chromium_page = None
+
+
+def _refill_contacts() -> None:
+    """Pre-draw a batch of Faker-backed contact fields."""
+    _contacts.extend(
+        (fake.name(), fake.email(), fake.city())
+        for _ in range(_CONTACT_BATCH)
+    )
+
+
+def _next_contact() -> tuple[str, str, str, str]:
+    """Pop the next (name, email, phone, location) contact tuple."""
+    if not _contacts:
+        _refill_contacts()
+    name, email, city = _contacts.popleft()
+    phone = (
+        f"({random.randint(200, 999)}) "
+        f"{random.randint(200, 999)}-{random.randint(1000, 9999)}"
+    )
+    return name, email, phone, f"{city}, {random.choice(_STATE_ABBRS)}"
+
+
+def _init_render_worker(renderer: str = "weasyprint") -> None:
+    """Per-process setup for PDF render workers.
+
+    Gives each worker its own Faker instance and reseeded RNG state.
+    The pool uses the spawn start method (implied by
+    max_tasks_per_child), where fresh processes get independent RNG
+    state anyway; explicit reseeding keeps contact data independent
+    even if the pool ever starts workers by fork. Also compiles the
+    Jinja templates once per worker instead of re-parsing them on
+    every render.
+    """
+    global fake, _templates, _font_config, _chromium_page
+    random.seed()
+    fake = Faker(use_weighting=False)
+    fake.seed_instance(None)
+    _contacts.clear()
+
+    env = Environment(
+        loader=FileSystemLoader("templates"),
+        auto_reload=False,
+        cache_size=-1,
+    )
+    _templates = {name: env.get_template(name) for name in TEMPLATES}
+
+    # WeasyPrint font loading is its expensive per-process init; one
+    # FontConfiguration shared across renders keeps the font cache warm
+    _font_config = FontConfiguration()
+
+    # Reused across renders (workers are single-threaded); the static
+    # fields are set once and only the per-resume fields are mutated
+    _metadata.clear()
+    _metadata["subject"] = "Professional Resume"
+    _metadata["creator"] = "Resume Generator"
+
+    # One persistent headless Chromium page per worker, reused across
+    # renders. Only when the renderer was chosen explicitly - a launch
+    # failure is left loud rather than silently falling back, since the
+    # two renderers differ (Chromium cannot embed PDF metadata)
+    _chromium_page = None
+    if renderer == "chromium":
+        playwright = sync_playwright().start()
+        browser = playwright.chromium.launch()
+        _chromium_page = browser.new_context().new_page()
+        atexit.register(playwright.stop)
 
 
 def render_pdf(resume_data: dict, index: int, template_name: str) -> Path:
-    """Render resume data to PDF with ATS-friendly metadata."""
-    # Add contact info from Faker
-    name = fake.name()
+    """Render resume data to PDF with ATS-friendly metadata.
+
+    Runs inside a process-pool worker; all state it needs is set up by
+    _init_render_worker.
+    """
+    # Add contact info from the pre-drawn pool
+    name, email, phone, location = _next_contact()
     resume_data["name"] = name
-    resume_data["email"] = fake.email()
-    resume_data["phone"] = fake.phone_number()
-    resume_data["location"] = f"{fake.city()}, {fake.state_abbr()}"
+    resume_data["email"] = email
+    resume_data["phone"] = phone
+    resume_data["location"] = location
 
-    # Render template
-    env = Environment(loader=FileSystemLoader("templates"))
-    template = env.get_template(template_name)
-    html_out = template.render(**resume_data)
+    # Render template (compiled once per worker by _init_render_worker)
+    html_out = _templates[template_name].render(**resume_data)
 
     # Write PDF with metadata for ATS parsing
     pdf_path = OUTPUT_DIR / f"resume_{index:04d}.pdf"
 
-    # PDF metadata helps ATS systems identify document type and content
-    metadata = {
-        "title": f"Resume - {name}",
-        "author": name,
-        "subject": "Professional Resume",
-        "keywords": ", ".join(resume_data.get("skills", [])[:10]),
-        "creator": "Resume Generator",
-    }
-
-    HTML(string=html_out).write_pdf(
-        str(pdf_path),
-        metadata=metadata
-    )
+    # The persistent Chromium page - a native renderer reused across
+    # calls - is several times faster than WeasyPrint. Chromium's pdf
+    # API cannot embed document metadata, which only the WeasyPrint
+    # path provides.
+    if _chromium_page is not None:
+        _chromium_page.set_content(html_out)
+        _chromium_page.pdf(path=str(pdf_path), format="Letter", print_background=True)
+        return pdf_path
+
+    # PDF metadata helps ATS systems identify document type and content;
+    # the dict is reused across renders and islice avoids copying the
+    # skills list just to take the first ten entries
+    _metadata["title"] = f"Resume - {name}"
+    _metadata["author"] = name
+    _metadata["keywords"] = ", ".join(islice(resume_data.get("skills", ()), 10))
+
+    # Stream straight to the open file so WeasyPrint doesn't build the
+    # whole PDF as an in-memory bytes object first
+    with open(pdf_path, "wb") as pdf_file:
+        HTML(string=html_out).write_pdf(
+            pdf_file,
+            metadata=_metadata,
+            font_config=_font_config
+        )
 
     return pdf_path
 
 
-async def generate_single_resume(
+async def generate_resume_batch(
     client: AsyncOpenAI,
-    index: int,
-    semaphore: asyncio.Semaphore,
+    indices: list[int],
+    assignments: list[tuple[str, str]],
+    pool: concurrent.futures.ProcessPoolExecutor,
     cost_tracker: CostTracker,
+    limiter: RateLimiter,
     progress: Progress,
-    task_id: int
-) -> tuple[int, float]:
-    """Generate a single resume with semaphore for rate limiting."""
-    async with semaphore:
-        # Select industry and correlated role
-        industry = random.choice(INDUSTRIES)
-        role = select_role(industry)
-        seniority = random.randint(1, 18)
-        template_name = random.choice(TEMPLATES)
-
-        # Generate resume data
-        resume_data, cost = await generate_resume_data(
-            client, industry, role, seniority, cost_tracker
-        )
+    task_id: int,
+    cost_log=None,
+    counter: ProgressCounter | None = None
+) -> tuple[list[int], float]:
+    """Generate a batch of resumes from a single API request."""
+    # Look up each resume's pre-drawn (industry, role) assignment
+    specs = []
+    for index in indices:
+        industry, role = assignments[index - 1]
+        specs.append((industry, role, random.randint(1, 18)))
+
+    # Generate resume data for the whole batch in one round-trip
+    resume_batch, cost, usage = await generate_resume_data(
+        client, specs, cost_tracker, limiter
+    )
 
-        # Render PDF (sync operation, but fast)
-        render_pdf(resume_data, index, template_name)
+    # Stream per-request detail so nothing accumulates in memory and a
+    # partial log survives an interrupted run
+    if cost_log is not None:
+        details = getattr(usage, "prompt_tokens_details", None)
+        await cost_log.write(orjson.dumps({
+            "indices": indices,
+            "input_tokens": usage.prompt_tokens,
+            "cached_tokens": getattr(details, "cached_tokens", 0) or 0,
+            "output_tokens": usage.completion_tokens,
+            "cost_usd": cost,
+        }).decode() + "\n")
+
+    # Render PDFs in the process pool - WeasyPrint is CPU-heavy and would
+    # otherwise stall every other in-flight coroutine on the event loop
+    loop = asyncio.get_running_loop()
+    await asyncio.gather(*(
+        loop.run_in_executor(
+            pool, render_pdf, resume_data, index, random.choice(TEMPLATES)
+        )
+        for index, resume_data in zip(indices, resume_batch)
+    ))
 
-        progress.advance(task_id)
-        return index, cost
+    if counter is not None:
+        counter.completed += len(indices)
+    else:
+        progress.advance(task_id, advance=len(indices))
+    return indices, cost
 
 
 def create_summary_table(
@@ -200,21 +471,45 @@ def create_summary_table(
     table.add_row("Speed", f"{total / elapsed:.1f} resumes/sec")
     table.add_row("", "")
     table.add_row("Input Tokens", f"{cost_tracker.total_input_tokens:,}")
+    table.add_row("Cached Tokens", f"{cost_tracker.total_cached_tokens:,}")
+    table.add_row("Cache Hit Rate", f"{cost_tracker.cache_hit_rate:.1%}")
     table.add_row("Output Tokens", f"{cost_tracker.total_output_tokens:,}")
     table.add_row("", "")
-    table.add_row("Avg Cost/Resume", f"${cost_tracker.avg_cost:.6f}")
+    avg_cost = cost_tracker.total_cost / total if total else 0
+    table.add_row("Avg Cost/Resume", f"${avg_cost:.6f}")
     table.add_row("Total Cost", f"${cost_tracker.total_cost:.4f}")
 
     return table
 
 
-async def main_async(total: int, save_costs: bool, concurrency: int = MAX_CONCURRENT):
+async def main_async(
+    total: int,
+    save_costs: bool,
+    concurrency: int = MAX_CONCURRENT,
+    batch_size: int = BATCH_SIZE,
+    rpm: int = REQUESTS_PER_MINUTE,
+    tpm: int = TOKENS_PER_MINUTE,
+    renderer: str = "weasyprint"
+):
     """Main async generation loop."""
     OUTPUT_DIR.mkdir(exist_ok=True)
 
-    client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    # One shared HTTP client sized to the worker count so TLS connections
+    # are reused instead of churned at high concurrency; retries absorb
+    # transient 429s rather than killing a worker coroutine
+    client = AsyncOpenAI(
+        api_key=os.getenv("OPENAI_API_KEY"),
+        max_retries=5,
+        http_client=httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=concurrency * 2,
+                max_keepalive_connections=concurrency * 2,
+            ),
+            timeout=httpx.Timeout(60.0, connect=10.0),
+        ),
+    )
     cost_tracker = CostTracker()
-    semaphore = asyncio.Semaphore(concurrency)
+    limiter = RateLimiter(rpm, tpm)
 
     # Rich progress display
     progress = Progress(
@@ -225,24 +520,80 @@ async def main_async(total: int, save_costs: bool, concurrency: int = MAX_CONCUR
         MofNCompleteColumn(),
         TimeElapsedColumn(),
         TimeRemainingColumn(),
-        console=console
+        console=console,
+        refresh_per_second=10
     )
 
     start_time = time.time()
 
-    with progress:
-        task_id = progress.add_task("Generating resumes", total=total)
-
-        # Create all tasks
-        tasks = [
-            generate_single_resume(
-                client, i, semaphore, cost_tracker, progress, task_id
-            )
-            for i in range(1, total + 1)
-        ]
+    # Recycle each render worker after 200 PDFs - WeasyPrint's font and
+    # cairo caches grow without bound, so long runs would otherwise OOM
+    pool = concurrent.futures.ProcessPoolExecutor(
+        max_workers=os.cpu_count(),
+        initializer=_init_render_worker,
+        initargs=(renderer,),
+        max_tasks_per_child=200,
+    )
 
-        # Run all tasks concurrently
-        await asyncio.gather(*tasks)
+    # Stream per-request costs as JSONL so the log survives interruption
+    # and nothing accumulates in memory for very large runs
+    cost_log = None
+    if save_costs:
+        cost_log = await aiofiles.open(OUTPUT_DIR / "cost_log.jsonl", "w")
+
+    async with client:
+        with pool, progress:
+            task_id = progress.add_task("Generating resumes", total=total)
+
+            # On big runs, batch progress updates through a counter and a
+            # 100 ms flusher so completions don't contend on Rich's render
+            # lock; small runs keep the immediate per-batch advance
+            counter = ProgressCounter() if total >= 200 else None
+            flusher = None
+            if counter is not None:
+                async def flush_progress():
+                    while True:
+                        progress.update(task_id, completed=counter.completed)
+                        await asyncio.sleep(0.1)
+
+                flusher = asyncio.create_task(flush_progress())
+
+            # Feed indices through a queue so only `concurrency` coroutines
+            # exist at any time - memory stays O(concurrency) regardless of
+            # total, and each PDF lands on disk as soon as its task finishes.
+            queue: asyncio.Queue[int] = asyncio.Queue()
+            for i in range(1, total + 1):
+                queue.put_nowait(i)
+
+            # One weighted draw for the whole run; per-task work becomes
+            # an index lookup
+            assignments = draw_assignments(total)
+
+            async def worker():
+                while True:
+                    indices = []
+                    while len(indices) < batch_size:
+                        try:
+                            indices.append(queue.get_nowait())
+                        except asyncio.QueueEmpty:
+                            break
+                    if not indices:
+                        return
+                    await generate_resume_batch(
+                        client, indices, assignments, pool, cost_tracker,
+                        limiter, progress, task_id, cost_log, counter
+                    )
+
+            try:
+                async with asyncio.TaskGroup() as tg:
+                    for _ in range(min(concurrency, total)):
+                        tg.create_task(worker())
+            finally:
+                if flusher is not None:
+                    flusher.cancel()
+                    progress.update(task_id, completed=counter.completed)
+                if cost_log is not None:
+                    await cost_log.close()
 
     elapsed = time.time() - start_time
 
@@ -252,24 +603,44 @@ async def main_async(total: int, save_costs: bool, concurrency: int = MAX_CONCUR
     console.print()
     console.print(f"[green]PDFs saved to:[/green] {OUTPUT_DIR.absolute()}/")
 
-    # Optionally save cost log
+    # Optionally save cost summary (per-request detail is in the JSONL log)
     if save_costs:
-        cost_log = {
+        cost_summary = {
             "total_resumes": total,
+            "total_requests": cost_tracker.request_count,
             "total_time_seconds": elapsed,
             "total_input_tokens": cost_tracker.total_input_tokens,
+            "total_cached_tokens": cost_tracker.total_cached_tokens,
             "total_output_tokens": cost_tracker.total_output_tokens,
             "total_cost_usd": cost_tracker.total_cost,
-            "avg_cost_per_resume_usd": cost_tracker.avg_cost,
-            "per_resume_costs_usd": cost_tracker.resume_costs
+            "avg_cost_per_resume_usd": (
+                cost_tracker.total_cost / total if total else 0
+            ),
         }
-        cost_file = OUTPUT_DIR / "cost_log.json"
-        with open(cost_file, "w") as f:
-            json.dump(cost_log, f, indent=2)
-        console.print(f"[dim]Cost log saved to: {cost_file}[/dim]")
+        cost_file = OUTPUT_DIR / "cost_summary.json"
+        with open(cost_file, "wb") as f:
+            f.write(orjson.dumps(cost_summary, option=orjson.OPT_INDENT_2))
+        console.print(
+            f"[dim]Cost summary saved to: {cost_file} "
+            f"(per-request log: {OUTPUT_DIR / 'cost_log.jsonl'})[/dim]"
+        )
 
 
 def main():
+    # Render-worker recycling relies on max_tasks_per_child, which on
+    # CPython < 3.11.9 (and 3.12.0-3.12.2) never respawns a recycled
+    # worker (python/cpython gh-115634): the pool deadlocks mid-run
+    # after the first worker crosses 200 renders, silently and after
+    # API spend. Refuse to start rather than hang.
+    version = sys.version_info
+    if version < (3, 11, 9) or (version[:2] == (3, 12) and version < (3, 12, 3)):
+        console.print(
+            "[red]Error:[/red] Python 3.11.9+ (or 3.12.3+) is required - "
+            "this interpreter never respawns recycled render workers and "
+            f"the run would hang (running {sys.version.split()[0]})"
+        )
+        sys.exit(1)
+
     parser = argparse.ArgumentParser(
         description="Generate synthetic PDF resumes for ATS testing",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -289,7 +660,8 @@ Examples:
     parser.add_argument(
         "--save-costs",
         action="store_true",
-        help="Save detailed cost log to output/cost_log.json"
+        help="Stream per-request cost log to output/cost_log.jsonl "
+             "and save output/cost_summary.json"
     )
     parser.add_argument(
         "--concurrency",
@@ -297,22 +669,95 @@ Examples:
         default=MAX_CONCURRENT,
         help=f"Max concurrent API requests (default: {MAX_CONCURRENT})"
     )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=BATCH_SIZE,
+        help=f"Resumes generated per API request (default: {BATCH_SIZE})"
+    )
+    parser.add_argument(
+        "--rpm",
+        type=int,
+        default=REQUESTS_PER_MINUTE,
+        help=f"API requests-per-minute budget (default: {REQUESTS_PER_MINUTE})"
+    )
+    parser.add_argument(
+        "--tpm",
+        type=int,
+        default=TOKENS_PER_MINUTE,
+        help=f"API tokens-per-minute budget (default: {TOKENS_PER_MINUTE})"
+    )
+    parser.add_argument(
+        "--renderer",
+        choices=("weasyprint", "chromium"),
+        default="weasyprint",
+        help="PDF renderer: weasyprint embeds ATS metadata; chromium is "
+             "faster but requires playwright and embeds no metadata "
+             "(default: weasyprint)"
+    )
 
     args = parser.parse_args()
 
+    # Zero or negative values make the worker drain loop collect nothing
+    # and exit immediately, silently rendering no PDFs
+    if args.batch_size < 1:
+        parser.error(f"--batch-size must be at least 1 (got {args.batch_size})")
+    if args.concurrency < 1:
+        parser.error(f"--concurrency must be at least 1 (got {args.concurrency})")
+
+    if args.renderer == "chromium" and sync_playwright is None:
+        parser.error(
+            "--renderer chromium requires the playwright package: "
+            "pip install playwright && playwright install chromium"
+        )
+
+    # A single request's token reservation must fit inside the TPM
+    # budget, or the rate limiter could never grant it and acquire would
+    # wait forever. Measure a worst-case batch prompt (longest industry
+    # and role names, maximum seniority) with the same formula
+    # generate_resume_data uses, so guard and reservation cannot drift.
+    longest_industry = max(ROLE_MAPPING, key=len)
+    longest_role = max(
+        (role for mapping in ROLE_MAPPING.values()
+         for pool_name in ("primary", "secondary")
+         for role in mapping[pool_name]),
+        key=len,
+    )
+    system_prompt, user_prompt = build_batch_prompt(
+        [(longest_industry, longest_role, 18)] * args.batch_size
+    )
+    per_request_tokens = (
+        (len(system_prompt) + len(user_prompt)) // 4
+        + args.batch_size * EST_COMPLETION_TOKENS_PER_RESUME
+    )
+    if per_request_tokens > args.tpm:
+        parser.error(
+            f"--batch-size {args.batch_size} needs ~{per_request_tokens} tokens "
+            f"per request, more than the --tpm budget of {args.tpm}; "
+            f"lower --batch-size or raise --tpm"
+        )
+
     # Use concurrency from args
     concurrency = args.concurrency
 
     # Header
     console.print(Panel.fit(
         f"[bold]Resume Generator[/bold]\n"
-        f"Model: {MODEL} | Concurrency: {concurrency} | Target: {args.count} resumes",
+        f"Model: {MODEL} | Concurrency: {concurrency} | "
+        f"Batch: {args.batch_size} | Renderer: {args.renderer} | "
+        f"Target: {args.count} resumes",
         border_style="blue"
     ))
     console.print()
 
-    # Run async main
-    asyncio.run(main_async(args.count, args.save_costs, concurrency))
+    # Run async main (on uvloop where available - the workload is httpx
+    # network-bound, so the faster event loop raises the concurrency ceiling)
+    if uvloop is not None:
+        uvloop.install()
+    asyncio.run(main_async(
+        args.count, args.save_costs, concurrency, args.batch_size,
+        args.rpm, args.tpm, args.renderer
+    ))
 
 
 if __name__ == "__main__":
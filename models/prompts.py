@@ -1,49 +1,41 @@
 """
 Prompt templates for resume generation with JSON output and seniority tiers.
 Optimized for ATS (Applicant Tracking System) parsing.
+
+Prompts are structured for OpenAI automatic prompt caching: all static
+content (ATS rules, schema, tier instructions) forms a long, byte-identical
+prefix, and the per-resume parameters are appended at the very end. Cache
+matching is prefix-based, so keeping the variable parts last lets every
+request after the first hit the cached prefix.
 """
 
-import json
-
-# JSON schema for structured resume output - ATS-friendly structure
-RESUME_SCHEMA = {
-    "summary": "2-3 sentence professional summary with keywords",
-    "skills": ["skill1", "skill2", "..."],
-    "experience": [
-        {
-            "title": "Standard Job Title (no abbreviations)",
-            "company": "Fictional Company Name",
-            "location": "City, State",
-            "start_date": "Month YYYY",
-            "end_date": "Month YYYY or Present",
-            "bullets": ["Action verb + task + result/metric", "..."]
-        }
-    ],
-    "education": [
-        {
-            "degree": "Full Degree Name (e.g., Bachelor of Science in Computer Science)",
-            "institution": "University Name",
-            "year": "YYYY",
-            "gpa": "3.X (optional, only if > 3.5)"
-        }
-    ],
-    "certifications": ["Full Certification Name (Issuing Organization)"]
-}
+import functools
+
+# Terse schema grammar for structured resume output - tokenizes to
+# roughly half of the old JSON example schema while GPT-class models
+# follow it just as reliably. Field-level rules (date format, bullet
+# style, degree names, gpa threshold) live in the cached system prompt
+# so they are paid once, not per request.
+SCHEMA_STR = (
+    "summary:str; skills:[str]; "
+    "experience:[{title,company,location,start_date,end_date,bullets:[str]}]; "
+    "education:[{degree,institution,year,gpa?}]; "
+    "certifications:[str]"
+)
+
 
-# Compact schema string for prompts
-SCHEMA_STR = json.dumps(RESUME_SCHEMA, separators=(',', ':'))
+# Tier per years of experience (index 0-18): 0-4 junior, 5-10 mid, 11+ senior
+_TIER_LUT = ("junior",) * 5 + ("mid",) * 6 + ("senior",) * 8
 
 
 def get_seniority_tier(years: int) -> str:
     """Determine seniority tier based on years of experience."""
-    if years <= 4:
-        return "junior"
-    elif years <= 10:
-        return "mid"
-    return "senior"
+    return _TIER_LUT[min(years, 18)]
 
 
-# System prompt - ATS optimization rules
+# System prompt - ATS optimization rules. Entirely static so it is cached
+# verbatim across every request; the extra guidance below also keeps the
+# cacheable prefix above OpenAI's ~1024-token caching threshold.
 SYSTEM_PROMPT = """Generate fictional resume JSON optimized for ATS parsing.
 
 ATS Rules:
@@ -59,45 +51,169 @@ Content Rules:
 - All data fictional - no real people/companies
 - Company names: use patterns like "Vertex Technologies", "Apex Solutions", "Summit Group"
 - Dates must be logical: no overlaps, recent job ends "Present" or within 6 months
-- Output valid JSON only"""
-
-
-# Tier-specific prompts - ATS-optimized
+- Output valid JSON only
+
+Summary Guidelines:
+- Open with the professional identity (role family + years of experience)
+- Name 2-3 core competencies that match the role's standard keyword set
+- Close with a differentiator: a domain specialty, scale handled, or measurable track record
+- Never use first-person pronouns or filler phrases ("results-driven", "team player")
+
+Bullet Construction:
+- Formula: Action Verb + What + How/With What + Quantified Outcome
+- Vary action verbs across bullets; never repeat the same verb twice in one job
+- Prefer outcome metrics ATS keyword scans reward: revenue, cost, time saved, error rate, throughput, headcount, adoption
+- Keep each bullet one sentence, under 30 words, no trailing period needed
+- Spell out technologies and methodologies on first use; follow with the common acronym in parentheses if widely used
+
+Skills Section Rules:
+- Order skills from most to least relevant for the stated role
+- Mix hard skills (tools, platforms, languages, methodologies) with a smaller number of soft skills
+- Use the canonical market name for each skill (e.g., "Microsoft Excel" not "Excel spreadsheets")
+- No proficiency qualifiers ("expert in", "familiar with") - bare skill names only
+
+Experience Consistency:
+- Career progression must be plausible: titles, scope, and company sizes grow with seniority
+- Earlier roles get fewer bullets and more tactical language; recent roles get more bullets and more strategic language
+- Employment gaps longer than 3 months should not appear
+- Locations should be real US cities paired with their correct state
+
+Education and Certifications:
+- Degree field should logically support the role (or be a plausible adjacent field)
+- Graduation year must align with total years of experience
+- Include gpa only when above 3.5; omit the field otherwise
+- Certifications must be real, current credentials relevant to the role and industry, formatted "Full Certification Name (Issuing Organization)"
+- List certifications most-recognized first; omit the section content if the role rarely requires them
+- Experience end_date is "Month YYYY" or "Present"
+
+Keyword Coverage:
+- Weave the role's standard keyword set through summary, bullets, and skills so parsers score the resume against typical job descriptions
+- Cover three keyword layers: core tools and platforms, methodologies and frameworks, and domain terminology for the industry
+- Repeat the two or three most important keywords in different sections rather than stacking them in one place
+- Never invent niche tool names; use technologies a recruiter in that industry would recognize immediately
+
+Company Naming Patterns:
+- Compose fictional employers from a neutral noun plus a corporate suffix: Vertex Technologies, Apex Solutions, Summit Group, Meridian Systems, Pinnacle Partners
+- Company size should be implied by role scope: early-career roles at smaller firms, senior roles at firms plausibly large enough for the stated team and budget
+- Do not reuse the same company name twice within one resume
+
+Title Progression Ladders:
+- Follow the industry's conventional ladder (e.g., Associate -> Mid -> Senior -> Lead/Principal or Analyst -> Manager -> Director)
+- Never jump more than one rung between consecutive jobs
+- Titles must match the industry's vocabulary: engineering ladders for technical roles, analyst/manager ladders for business roles
+
+Quantification Patterns:
+- Mix metric types across bullets: percentages for improvements, dollar figures for revenue or savings, counts for scale (users, transactions, team size)
+- Keep magnitudes plausible for the company size and seniority implied; a junior engineer does not save $50M
+- Round numbers naturally (35%, $1.2M, 40+ clients) rather than using suspiciously precise values
+
+Plausibility Checks:
+- Total experience implied by the job history must match the stated years within one year
+- Skills listed must be supported by at least one job or education entry; no orphan skills
+- Locations across jobs may differ, but relocations should be infrequent and consistent with career progression
+- Summary claims, bullet achievements, and the skills list must not contradict each other
+
+Formatting for ATS Parsers:
+- Plain text values only: no markdown, no special bullets, no tabs, no Unicode dashes
+- Do not abbreviate months, states are fine abbreviated in locations
+- Avoid tables, columns, or nested structures beyond the schema
+- Every field in the schema must be present; use an empty array when a section has no entries"""
+
+
+# Tier-specific prompt prefixes - fully static per tier (instructions +
+# schema), so the user-prompt prefix is byte-identical across requests for
+# the same tier and eligible for automatic prompt caching. The variable
+# parameters are appended by build_prompt after this prefix.
 TIER_PROMPTS = {
-    "junior": """{role} in {industry}, {seniority}yrs exp.
+    "junior": """Junior-tier resume.
 1-2 jobs, education focus, 2-3 bullets each.
 Include: relevant coursework/projects, internships count as jobs.
 Skills: 8-12 relevant technical and soft skills.
 Schema:{schema}""",
 
-    "mid": """{role} in {industry}, {seniority}yrs exp.
+    "mid": """Mid-tier resume.
 3-4 jobs, balanced achievements, 3-4 bullets each.
 Include: promotions, team leadership, project ownership.
 Skills: 12-15 skills mixing technical expertise and domain knowledge.
 Schema:{schema}""",
 
-    "senior": """{role} in {industry}, {seniority}yrs exp.
+    "senior": """Senior-tier resume.
 4-5 jobs, leadership focus, 4-5 bullets each.
 Include: team size managed, budget responsibility, strategic initiatives.
 Skills: 15-20 skills including leadership, strategy, and technical expertise.
 Schema:{schema}"""
 }
 
+# Rendered once at import: static tier instructions + schema per tier
+TIER_PREFIXES = {
+    tier: template.format(schema=SCHEMA_STR)
+    for tier, template in TIER_PROMPTS.items()
+}
+
+
+# Batch prompt - static instructions and schema for generating several
+# resumes in one request; per-resume parameters are appended as numbered
+# lines after this prefix, so the prefix stays cacheable
+BATCH_PROMPT = """Generate one fictional resume per parameter line below.
+Return JSON: {{"resumes":[...]}} with one schema object per parameter line, in the same order.
+Apply the tier guidance matching each line's tier:
+- junior: 1-2 jobs, education focus, 2-3 bullets each; relevant coursework/projects, internships count as jobs; 8-12 technical and soft skills.
+- mid: 3-4 jobs, balanced achievements, 3-4 bullets each; promotions, team leadership, project ownership; 12-15 skills mixing technical expertise and domain knowledge.
+- senior: 4-5 jobs, leadership focus, 4-5 bullets each; team size managed, budget responsibility, strategic initiatives; 15-20 skills including leadership, strategy, and technical expertise.
+Schema:{schema}"""
+
+BATCH_PREFIX = BATCH_PROMPT.format(schema=SCHEMA_STR)
+
+
+# The (tier, role, industry, seniority) space is small and bounded, so
+# identical prompts recur constantly on bulk runs; memoizing makes
+# repeats free and byte-identical (the same str object every time)
+@functools.lru_cache(maxsize=4096)
+def _render_user_prompt(tier: str, role: str, industry: str, seniority: int) -> str:
+    return (
+        TIER_PREFIXES[tier]
+        + f"\n---\nParameters: role={role}; industry={industry}; seniority={seniority}yrs"
+    )
+
+
+@functools.lru_cache(maxsize=4096)
+def _render_param_line(role: str, industry: str, seniority: int) -> str:
+    return (
+        f"role={role}; industry={industry}; seniority={seniority}yrs; "
+        f"tier={get_seniority_tier(seniority)}"
+    )
+
 
 def build_prompt(industry: str, role: str, seniority: int) -> tuple[str, str]:
     """
     Build system and user prompts for resume generation.
 
+    The user prompt is a static cacheable prefix for the seniority tier,
+    with the variable parameters appended at the end. Rendered prompts
+    are memoized on the parameter tuple.
+
     Returns:
         tuple: (system_prompt, user_prompt)
     """
     tier = get_seniority_tier(seniority)
 
-    user_prompt = TIER_PROMPTS[tier].format(
-        role=role,
-        industry=industry,
-        seniority=seniority,
-        schema=SCHEMA_STR
+    return SYSTEM_PROMPT, _render_user_prompt(tier, role, industry, seniority)
+
+
+def build_batch_prompt(specs: list[tuple[str, str, int]]) -> tuple[str, str]:
+    """
+    Build system and user prompts for a batch of resumes in one request.
+
+    Each spec is an (industry, role, seniority) triple. The user prompt
+    shares the same static cacheable prefix across all batches; only the
+    numbered parameter lines at the end vary.
+
+    Returns:
+        tuple: (system_prompt, user_prompt)
+    """
+    lines = "\n".join(
+        f"{i}. {_render_param_line(role, industry, seniority)}"
+        for i, (industry, role, seniority) in enumerate(specs, start=1)
     )
 
-    return SYSTEM_PROMPT, user_prompt
+    return SYSTEM_PROMPT, BATCH_PREFIX + "\n---\nParameters:\n" + lines